@@ -4,11 +4,43 @@ ACISS Template Compliance Checker
 Validates that all chapter XHTML files follow the ACISS template structure
 """
 
+import functools
 import os
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from bs4 import BeautifulSoup
+from lxml import etree, html
 import re
 
+# Patterns compiled once at import so each chapter scan reuses the same
+# Pattern objects instead of recompiling per file/element
+IMG_QUOTE_RE = re.compile(r'chapter.*quote')
+ROMAN_RE = re.compile(r'\b[IVX]+\b')
+ANSWER_RE = re.compile(r'answer|correct|solution', re.IGNORECASE)
+
+# Class lookups as precompiled lxml XPath: element scans run entirely in C
+# instead of calling a Python regex against every node's class attribute.
+# Exact-token matches pad @class with spaces; loose matches use contains()
+# like the old substring regexes did
+XP_CHAP_TITLE = etree.XPath(
+    "//section[contains(concat(' ', @class, ' '), ' chap-title ')]")
+XP_CONTENT_AREA = etree.XPath(
+    "//div[contains(concat(' ', @class, ' '), ' content-area ')]")
+XP_WORKSHEET = etree.XPath(
+    "//*[contains(@class, 'worksheet') or contains(@class, 'journal')]")
+XP_IMAGE_QUOTE = etree.XPath(
+    "//section[contains(concat(' ', @class, ' '), ' image-quote ')]")
+XP_IMG_SRC = etree.XPath("//img/@src")
+XP_BIBLE = etree.XPath(
+    "//*[contains(@class, 'bible-quote') or contains(@class, 'epigraph')]")
+XP_DROPCAP = etree.XPath("//*[contains(@class, 'dropcap')]")
+XP_QUIZ = etree.XPath("//*[contains(@class, 'quiz')]")
+XP_QUIZ_ITEMS = etree.XPath(".//li")
+XP_QUESTIONS = etree.XPath(".//*[contains(@class, 'question')]")
+
+def _check_chapter(checker, file_path):
+    """Process-pool entry point for a single chapter check"""
+    return checker.check_chapter_file(file_path)
+
 class ACISSComplianceChecker:
     def __init__(self, epub_dir):
         self.epub_dir = Path(epub_dir)
@@ -30,12 +62,18 @@ class ACISSComplianceChecker:
             
         print(f"Found {len(chapter_files)} chapter files to check\n")
         
+        # Chapters are independent, so fan the CPU-bound parse/check work
+        # out across cores; issues come back as return values because
+        # worker processes can't mutate this checker's state
         compliant_count = 0
-        for chapter_file in chapter_files:
-            is_compliant = self.check_chapter_file(chapter_file)
-            if is_compliant:
-                compliant_count += 1
-                
+        with ProcessPoolExecutor() as executor:
+            for is_compliant, chapter_issues, report in executor.map(
+                    functools.partial(_check_chapter, self), chapter_files):
+                print(report, end='')
+                self.issues.extend(chapter_issues)
+                if is_compliant:
+                    compliant_count += 1
+
         print(f"\n=== COMPLIANCE SUMMARY ===")
         print(f"Total chapters checked: {len(chapter_files)}")
         print(f"Fully compliant: {compliant_count}")
@@ -44,116 +82,115 @@ class ACISSComplianceChecker:
         return len(self.issues) == 0
         
     def check_chapter_file(self, file_path):
-        """Check ACISS compliance for a single chapter file"""
-        print(f"📄 Checking: {file_path.name}")
+        """Check ACISS compliance for a single chapter file.
+
+        Returns (is_compliant, issues, report) so results can be collected
+        from worker processes; the per-file console report is buffered into
+        one string instead of flushing stdout line by line.
+        """
+        lines = [f"📄 Checking: {file_path.name}"]
         
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
+            # Parse straight into an lxml tree; all structural checks below
+            # run as precompiled XPath against it
+            with open(file_path, 'rb') as f:
                 content = f.read()
-                
-            soup = BeautifulSoup(content, 'html.parser')
+
+            doc = html.fromstring(content)
             chapter_issues = []
-            
+
             # 1. Check for title page section with .chap-title class
-            chap_title = soup.find('section', class_='chap-title')
-            if not chap_title:
+            if not XP_CHAP_TITLE(doc):
                 chapter_issues.append("Missing title page section with .chap-title class")
             else:
-                print("  ✅ Title page section (.chap-title) present")
-                
+                lines.append("  ✅ Title page section (.chap-title) present")
+
             # 2. Check for .content-area wrapper
-            content_area = soup.find('div', class_='content-area')
-            if not content_area:
+            if not XP_CONTENT_AREA(doc):
                 chapter_issues.append("Missing .content-area wrapper div")
             else:
-                print("  ✅ Content area wrapper (.content-area) present")
-                
+                lines.append("  ✅ Content area wrapper (.content-area) present")
+
             # 3. Check quiz section (≤ 4 questions, no answer keys)
-            self.check_quiz_section(soup, chapter_issues, file_path.name)
-            
+            self.check_quiz_section(doc, chapter_issues, lines)
+
             # 4. Check for worksheet section
-            worksheet = soup.find(attrs={'class': re.compile(r'worksheet|journal')})
-            if worksheet:
-                print("  ✅ Worksheet/journal section present")
+            if XP_WORKSHEET(doc):
+                lines.append("  ✅ Worksheet/journal section present")
             else:
-                print("  ⚠️  No worksheet/journal section found")
-                
+                lines.append("  ⚠️  No worksheet/journal section found")
+
             # 5. Check for closing image
-            closing_image = soup.find('section', class_='image-quote') or soup.find('img', src=re.compile(r'chapter.*quote'))
+            closing_image = XP_IMAGE_QUOTE(doc) or any(
+                IMG_QUOTE_RE.search(src) for src in XP_IMG_SRC(doc))
             if closing_image:
-                print("  ✅ Closing image/quote present")
+                lines.append("  ✅ Closing image/quote present")
             else:
                 chapter_issues.append("Missing closing image section")
-                
-            # 6. Check Roman numeral in chapter number
-            roman_found = False
-            for text in soup.stripped_strings:
-                if re.search(r'\b[IVX]+\b', text):
-                    roman_found = True
-                    break
+
+            # 6. Check Roman numeral in chapter number — one regex pass over
+            # the flat document text instead of walking every text node
+            roman_found = bool(ROMAN_RE.search(doc.text_content()))
             if roman_found:
-                print("  ✅ Roman numeral found")
+                lines.append("  ✅ Roman numeral found")
             else:
-                print("  ⚠️  No Roman numeral detected")
-                
+                lines.append("  ⚠️  No Roman numeral detected")
+
             # 7. Check for Bible quote/epigraph
-            bible_quote = soup.find(attrs={'class': re.compile(r'bible-quote|epigraph')})
-            if bible_quote:
-                print("  ✅ Bible quote/epigraph present")
+            if XP_BIBLE(doc):
+                lines.append("  ✅ Bible quote/epigraph present")
             else:
-                print("  ⚠️  No Bible quote/epigraph section found")
-                
+                lines.append("  ⚠️  No Bible quote/epigraph section found")
+
             # 8. Check for drop cap
-            drop_cap = soup.find(attrs={'class': re.compile(r'dropcap')})
-            if drop_cap:
-                print("  ✅ Drop cap styling present")
+            if XP_DROPCAP(doc):
+                lines.append("  ✅ Drop cap styling present")
             else:
-                print("  ⚠️  No drop cap styling found")
+                lines.append("  ⚠️  No drop cap styling found")
             
             if chapter_issues:
-                self.issues.extend([f"{file_path.name}: {issue}" for issue in chapter_issues])
-                print(f"  ❌ {len(chapter_issues)} issues found")
-                return False
+                lines.append(f"  ❌ {len(chapter_issues)} issues found")
+                result = False, [f"{file_path.name}: {issue}" for issue in chapter_issues]
             else:
-                print("  🎉 Chapter fully compliant with ACISS template")
-                return True
-                
+                lines.append("  🎉 Chapter fully compliant with ACISS template")
+                result = True, []
+
         except Exception as e:
             error_msg = f"Error processing {file_path.name}: {e}"
-            self.issues.append(error_msg)
-            print(f"  ❌ {error_msg}")
-            return False
-        finally:
-            print()  # Add spacing between files
+            lines.append(f"  ❌ {error_msg}")
+            result = False, [error_msg]
+
+        lines.append("")  # Add spacing between files
+        is_compliant, issues = result
+        return is_compliant, issues, "\n".join(lines) + "\n"
             
-    def check_quiz_section(self, soup, chapter_issues, filename):
-        """Check quiz section compliance"""
-        quiz_sections = soup.find_all(attrs={'class': re.compile(r'quiz')})
-        
+    def check_quiz_section(self, doc, chapter_issues, lines):
+        """Check quiz section compliance, appending report lines"""
+        quiz_sections = XP_QUIZ(doc)
+
         if not quiz_sections:
-            print("  ⚠️  No quiz section found")
+            lines.append("  ⚠️  No quiz section found")
             return
-            
+
         for quiz in quiz_sections:
             # Count questions
-            questions = quiz.find_all('li') or quiz.find_all(attrs={'class': re.compile(r'question')})
+            questions = XP_QUIZ_ITEMS(quiz) or XP_QUESTIONS(quiz)
             question_count = len(questions)
-            
+
             if question_count > 4:
                 chapter_issues.append(f"Quiz has {question_count} questions (max 4 allowed)")
-                print(f"  ❌ Quiz has {question_count} questions (exceeds limit of 4)")
+                lines.append(f"  ❌ Quiz has {question_count} questions (exceeds limit of 4)")
             elif question_count > 0:
-                print(f"  ✅ Quiz section present with {question_count} questions")
+                lines.append(f"  ✅ Quiz section present with {question_count} questions")
             else:
-                print("  ⚠️  Quiz section found but no questions detected")
-                
+                lines.append("  ⚠️  Quiz section found but no questions detected")
+
             # Check for embedded answers (should not be present)
-            answer_indicators = quiz.find_all(text=re.compile(r'answer|correct|solution', re.IGNORECASE))
-            if answer_indicators:
+            if ANSWER_RE.search(quiz.text_content()):
                 chapter_issues.append("Quiz contains embedded answers")
-                print("  ❌ Quiz contains embedded answers (should not have answers)")
+                lines.append("  ❌ Quiz contains embedded answers (should not have answers)")
             else:
-                print("  ✅ No embedded answers found in quiz")
+                lines.append("  ✅ No embedded answers found in quiz")
                 
     def save_report(self, output_file):
         """Save compliance results to file"""
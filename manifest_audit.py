@@ -9,6 +9,8 @@ from pathlib import Path
 from lxml import etree
 import sys
 
+OPF_NS = 'http://www.idpf.org/2007/opf'
+
 class ManifestAuditor:
     def __init__(self, epub_dir):
         self.epub_dir = Path(epub_dir)
@@ -26,31 +28,36 @@ class ManifestAuditor:
             
         # Parse content.opf
         tree = etree.parse(self.content_opf)
-        ns = {'opf': 'http://www.idpf.org/2007/opf'}
-        
-        # Get all manifest items and spine items
-        manifest_items = tree.xpath('//opf:item', namespaces=ns)
-        spine_items = tree.xpath('//opf:itemref', namespaces=ns)
-        
-        self.check_manifest_files(manifest_items)
-        self.check_orphan_files(manifest_items)
-        self.check_spine_integrity(manifest_items, spine_items)
+
+        # Pull the attributes out of the tree in two comprehensions over
+        # tree.iter() so the checks below work on plain tuples/strings and
+        # never touch lxml elements again
+        manifest_items = [(e.get('id'), e.get('href'))
+                          for e in tree.iter(f'{{{OPF_NS}}}item')]
+        spine_idrefs = [e.get('idref') for e in tree.iter(f'{{{OPF_NS}}}itemref')]
+
+        # One filesystem walk feeds both existence checks: missing and
+        # orphan files fall out of set membership instead of a stat call
+        # per manifest entry
+        disk_hrefs = {rel for rel in self.iter_oebps_files() if rel != 'content.opf'}
+
+        self.check_manifest_files(manifest_items, disk_hrefs)
+        self.check_orphan_files(manifest_items, disk_hrefs)
+        self.check_spine_integrity(manifest_items, spine_idrefs)
         
         return len(self.issues) == 0
         
-    def check_manifest_files(self, manifest_items):
+    def check_manifest_files(self, manifest_items, disk_hrefs):
         """Check if all manifest entries correspond to actual files"""
         print("1. MANIFEST FILE EXISTENCE CHECK")
         print("-" * 40)
-        
-        missing_files = []
-        for item in manifest_items:
-            href = item.get('href')
-            file_path = self.oebps_dir / href
-            
-            if not file_path.exists():
-                missing_files.append(f"Missing: {href} (referenced in manifest)")
-                
+
+        missing_files = [
+            f"Missing: {href} (referenced in manifest)"
+            for _item_id, href in manifest_items
+            if href not in disk_hrefs
+        ]
+
         if missing_files:
             self.issues.extend(missing_files)
             for missing in missing_files:
@@ -61,27 +68,37 @@ class ManifestAuditor:
         print(f"Total manifest items: {len(manifest_items)}")
         print(f"Missing files: {len(missing_files)}\n")
         
-    def check_orphan_files(self, manifest_items):
+    def iter_oebps_files(self):
+        """Yield OEBPS file paths relative to the OEBPS root in forward-slash
+        href form, via a recursive os.scandir walk.
+
+        DirEntry carries the file type from the directory read itself, and
+        relative paths come from string slicing — no per-file stat calls and
+        no Path/relative_to allocation per entry.
+        """
+        base_len = len(str(self.oebps_dir)) + 1
+
+        def walk(directory):
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.is_dir():
+                        yield from walk(entry.path)
+                    elif entry.is_file():
+                        yield entry.path[base_len:].replace(os.sep, '/')
+
+        yield from walk(self.oebps_dir)
+
+    def check_orphan_files(self, manifest_items, disk_hrefs):
         """Check for files in OEBPS not referenced in manifest"""
         print("2. ORPHAN FILES CHECK")
         print("-" * 40)
-        
+
         # Get all manifest hrefs
-        manifest_hrefs = {item.get('href') for item in manifest_items}
-        
-        # Find all files in OEBPS (excluding content.opf)
-        orphan_files = []
-        for root, dirs, files in os.walk(self.oebps_dir):
-            for file in files:
-                if file == 'content.opf':
-                    continue
-                    
-                file_path = Path(root) / file
-                relative_path = file_path.relative_to(self.oebps_dir)
-                
-                if str(relative_path) not in manifest_hrefs:
-                    orphan_files.append(str(relative_path))
-                    
+        manifest_hrefs = {href for _item_id, href in manifest_items}
+
+        # Files on disk with no manifest entry, as a single set difference
+        orphan_files = sorted(disk_hrefs - manifest_hrefs)
+
         if orphan_files:
             self.issues.append(f"Found {len(orphan_files)} orphan files not in manifest")
             for orphan in orphan_files:
@@ -89,55 +106,52 @@ class ManifestAuditor:
         else:
             print("✅ No orphan files found")
             
-        print(f"Total OEBPS files: {len(manifest_hrefs) + len(orphan_files) + 1}")  # +1 for content.opf
+        print(f"Total OEBPS files: {len(disk_hrefs) + 1}")  # +1 for content.opf
         print(f"Orphan files: {len(orphan_files)}\n")
         
-    def check_spine_integrity(self, manifest_items, spine_items):
+    def check_spine_integrity(self, manifest_items, spine_idrefs):
         """Check spine references and reading order"""
         print("3. SPINE INTEGRITY CHECK")
         print("-" * 40)
-        
+
         # Create manifest ID lookup
-        manifest_ids = {item.get('id'): item.get('href') for item in manifest_items}
-        
-        # Check spine references
+        manifest_ids = dict(manifest_items)
+        lookup = manifest_ids.get
+
+        # Validate idrefs and check reading order in a single pass over the
+        # spine, resolving each idref exactly once
         spine_issues = []
+        reading_order_issues = []
         xhtml_count = 0
-        
-        for i, spine_item in enumerate(spine_items):
-            idref = spine_item.get('idref')
-            
-            if idref not in manifest_ids:
+        prev_num = 0
+
+        for i, idref in enumerate(spine_idrefs):
+            href = lookup(idref)
+
+            if href is None:
                 spine_issues.append(f"Spine item {i+1}: ID '{idref}' not found in manifest")
-            else:
-                href = manifest_ids[idref]
-                if href.endswith('.xhtml'):
-                    xhtml_count += 1
-                    
+                continue
+
+            if href.endswith('.xhtml'):
+                xhtml_count += 1
+
+            # Reading order check (numbered files should be in order)
+            if href.startswith('text/') and href[5].isdigit():
+                try:
+                    file_num = int(href.split('-')[0][5:])  # Extract number from filename
+                    if file_num < prev_num:
+                        reading_order_issues.append(f"Reading order issue: {href} (#{file_num}) after #{prev_num}")
+                    prev_num = file_num
+                except (ValueError, IndexError):
+                    pass  # Skip if parsing fails
+
         if spine_issues:
             self.issues.extend(spine_issues)
             for issue in spine_issues:
                 print(f"❌ {issue}")
         else:
             print("✅ All spine items reference valid manifest entries")
-            
-        # Check for proper reading order (numbered files should be in order)
-        reading_order_issues = []
-        prev_num = 0
-        
-        for spine_item in spine_items:
-            idref = spine_item.get('idref')
-            if idref in manifest_ids:
-                href = manifest_ids[idref]
-                if href.startswith('text/') and href[5].isdigit():
-                    try:
-                        file_num = int(href.split('-')[0][5:])  # Extract number from filename
-                        if file_num < prev_num:
-                            reading_order_issues.append(f"Reading order issue: {href} (#{file_num}) after #{prev_num}")
-                        prev_num = file_num
-                    except (ValueError, IndexError):
-                        pass  # Skip if parsing fails
-                        
+
         if reading_order_issues:
             self.issues.extend(reading_order_issues)
             for issue in reading_order_issues:
@@ -145,7 +159,7 @@ class ManifestAuditor:
         else:
             print("✅ Reading order appears correct")
             
-        print(f"Total spine items: {len(spine_items)}")
+        print(f"Total spine items: {len(spine_idrefs)}")
         print(f"XHTML files in spine: {xhtml_count}")
         print(f"Spine issues: {len(spine_issues + reading_order_issues)}\n")
         
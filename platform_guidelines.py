@@ -5,19 +5,104 @@ Check EPUB compliance with KDP, Apple Books, and other platform requirements
 """
 
 import os
-import zipfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from bs4 import BeautifulSoup
+from lxml import html
 import re
 
+# Compiled once at import rather than per check
+ITEMREF_RE = re.compile(r'<itemref idref="([^"]+)"')
+
+# Video/audio extensions disallowed on KDP
+MEDIA_EXTS = ('.mp4', '.avi', '.mov', '.mp3', '.wav', '.ogg')
+
+# Bytes pattern so the script scan needs neither a UTF-8 decode nor a
+# lowercased copy of each file
+SCRIPT_TAG_RE = re.compile(rb'<script', re.IGNORECASE)
+
 class PlatformGuidelinesChecker:
     def __init__(self, epub_dir):
         self.epub_dir = Path(epub_dir)
         self.oebps_dir = self.epub_dir / 'OEBPS'
         self.epub_file = self.epub_dir / 'curls-and-contemplation.epub'
+        self.sample_xhtml = (self.oebps_dir / 'text' /
+                             '9-chapter-i-unveiling-your-creative-odyssey.xhtml')
         self.issues = []
         self.warnings = []
-        
+        self._opf_content = None
+        self._sample_content = None
+        self._sample_doc = None
+        self._inventory = None
+
+    def opf_text(self):
+        """content.opf text, read once per run and shared by every check"""
+        if self._opf_content is None:
+            self._opf_content = (self.oebps_dir / 'content.opf').read_text(encoding='utf-8')
+        return self._opf_content
+
+    def sample_chapter_text(self):
+        """Sample chapter text, read once per run"""
+        if self._sample_content is None:
+            self._sample_content = self.sample_xhtml.read_text(encoding='utf-8')
+        return self._sample_content
+
+    def sample_chapter_doc(self):
+        """Sample chapter parsed into an lxml tree, once per run"""
+        if self._sample_doc is None:
+            self._sample_doc = html.fromstring(self.sample_xhtml.read_bytes())
+        return self._sample_doc
+
+    def scan_oebps_files(self):
+        """Yield a DirEntry for every file under OEBPS via os.scandir.
+
+        DirEntry caches stat data from the directory read, so size checks
+        cost no extra syscall per file.
+        """
+        def walk(directory):
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.is_dir():
+                        yield from walk(entry.path)
+                    elif entry.is_file():
+                        yield entry
+
+        yield from walk(self.oebps_dir)
+
+    def oebps_inventory(self):
+        """Categorize every OEBPS file in one walk, cached per run.
+
+        Replaces the dozen separate rglob sweeps the checks used to run —
+        each a full tree traversal — with a single scandir pass; large-image
+        sizes come from the DirEntry stat cache during the same walk.
+        """
+        if self._inventory is not None:
+            return self._inventory
+
+        inv = {'js': [], 'xhtml': [], 'media': [], 'large_images': [],
+               'covers': [], 'tocs': []}
+        for entry in self.scan_oebps_files():
+            name = entry.name
+            lower = name.lower()
+            if lower.endswith('.js'):
+                inv['js'].append(name)
+            elif lower.endswith('.xhtml'):
+                inv['xhtml'].append(Path(entry.path))
+                if 'toc' in lower or 'contents' in lower:
+                    inv['tocs'].append(name)
+            elif lower.endswith(MEDIA_EXTS):
+                inv['media'].append(name)
+            elif name.endswith('.JPEG'):
+                size = entry.stat().st_size
+                if size > 2 * 1024 * 1024:  # 2MB KDP guideline
+                    inv['large_images'].append(f"{name} ({size / 1024 / 1024:.1f}MB)")
+            if lower.startswith('cover.'):
+                inv['covers'].append(name)
+
+        inv['xhtml'].sort()
+        inv['tocs'].sort()
+        self._inventory = inv
+        return inv
+
     def check_all_platforms(self):
         """Check compliance with all major platform guidelines"""
         print("=== PLATFORM-SPECIFIC GUIDELINES REVIEW ===\\n")
@@ -45,22 +130,28 @@ class PlatformGuidelinesChecker:
         print("📚 KINDLE DIRECT PUBLISHING (KDP) REQUIREMENTS")
         print("-" * 50)
         
+        inventory = self.oebps_inventory()
+
         # 1. No JavaScript
-        js_files = list(self.oebps_dir.rglob('*.js'))
+        js_files = inventory['js']
         if js_files:
-            self.issues.append(f"KDP: JavaScript files found: {[f.name for f in js_files]}")
+            self.issues.append(f"KDP: JavaScript files found: {js_files}")
             print("  ❌ JavaScript files detected (not allowed on KDP)")
         else:
             print("  ✅ No JavaScript files found")
-            
-        # 2. Check for script tags in XHTML
+
+        # 2. Check for script tags in XHTML — overlap the file reads with a
+        # thread pool; the scan itself stays on this thread so the issue
+        # list keeps a stable order
         script_found = False
-        for xhtml_file in self.oebps_dir.rglob('*.xhtml'):
-            with open(xhtml_file, 'r', encoding='utf-8') as f:
-                content = f.read()
-                if '<script' in content.lower():
-                    script_found = True
-                    self.issues.append(f"KDP: Script tags found in {xhtml_file.name}")
+        xhtml_files = inventory['xhtml']
+        if xhtml_files:
+            with ThreadPoolExecutor(max_workers=min(16, len(xhtml_files))) as executor:
+                contents = executor.map(Path.read_bytes, xhtml_files)
+                for xhtml_file, data in zip(xhtml_files, contents):
+                    if SCRIPT_TAG_RE.search(data):
+                        script_found = True
+                        self.issues.append(f"KDP: Script tags found in {xhtml_file.name}")
                     
         if script_found:
             print("  ❌ Script tags found in XHTML files")
@@ -68,22 +159,17 @@ class PlatformGuidelinesChecker:
             print("  ✅ No script tags in XHTML files")
             
         # 3. No video/audio files
-        media_files = []
-        for ext in ['*.mp4', '*.avi', '*.mov', '*.mp3', '*.wav', '*.ogg']:
-            media_files.extend(list(self.oebps_dir.rglob(ext)))
-            
+        media_files = inventory['media']
         if media_files:
-            self.issues.append(f"KDP: Media files found: {[f.name for f in media_files]}")
+            self.issues.append(f"KDP: Media files found: {media_files}")
             print("  ❌ Video/audio files detected")
         else:
             print("  ✅ No video/audio files found")
-            
-        # 4. Check image sizes (recommend < 2MB each for KDP)
-        large_images = []
-        for img_file in self.oebps_dir.rglob('*.JPEG'):
-            if img_file.stat().st_size > 2 * 1024 * 1024:  # 2MB
-                large_images.append(f"{img_file.name} ({img_file.stat().st_size / 1024 / 1024:.1f}MB)")
-                
+
+        # 4. Check image sizes (recommend < 2MB each for KDP); sizes were
+        # collected from the DirEntry stat cache during the inventory walk
+        large_images = inventory['large_images']
+
         if large_images:
             self.warnings.append(f"KDP: Large images may cause issues: {large_images}")
             print(f"  ⚠️  Large images found (>2MB): {len(large_images)}")
@@ -107,36 +193,31 @@ class PlatformGuidelinesChecker:
         print("-" * 50)
         
         # 1. Check for EPUB 3.2 compliance
-        with open(self.oebps_dir / 'content.opf', 'r', encoding='utf-8') as f:
-            opf_content = f.read()
-            
+        opf_content = self.opf_text()
+
         if 'version="3.0"' in opf_content:
             print("  ✅ EPUB 3.0+ version detected")
         else:
             self.issues.append("Apple Books: EPUB version should be 3.0 or higher")
             print("  ❌ EPUB version not 3.0+")
             
-        # 2. Check accessibility features (Apple emphasizes these)
+        # 2. Check accessibility features (Apple emphasizes these); each
+        # probe is a single XPath existence check on the cached lxml tree
         accessibility_features = []
-        sample_xhtml = self.oebps_dir / 'text' / '9-chapter-i-unveiling-your-creative-odyssey.xhtml'
-        
-        with open(sample_xhtml, 'r', encoding='utf-8') as f:
-            content = f.read()
-            soup = BeautifulSoup(content, 'html.parser')
-            
-            # Check for alt text
-            imgs_without_alt = soup.find_all('img', alt=lambda x: x is None)
-            if not imgs_without_alt:
-                accessibility_features.append("alt text on images")
-                
-            # Check for ARIA labels
-            if soup.find_all(attrs={'aria-label': True}):
-                accessibility_features.append("ARIA labels")
-                
-            # Check for semantic markup
-            if soup.find_all(['section', 'article', 'nav', 'aside']):
-                accessibility_features.append("semantic HTML5")
-                
+        doc = self.sample_chapter_doc()
+
+        # Check for alt text
+        if not doc.xpath('//img[not(@alt)]'):
+            accessibility_features.append("alt text on images")
+
+        # Check for ARIA labels
+        if doc.xpath('//*[@aria-label]'):
+            accessibility_features.append("ARIA labels")
+
+        # Check for semantic markup
+        if doc.xpath('//section | //article | //nav | //aside'):
+            accessibility_features.append("semantic HTML5")
+
         if accessibility_features:
             print(f"  ✅ Accessibility features present: {', '.join(accessibility_features)}")
         else:
@@ -163,9 +244,8 @@ class PlatformGuidelinesChecker:
         print("-" * 50)
         
         # 1. Check spine linear order
-        with open(self.oebps_dir / 'content.opf', 'r', encoding='utf-8') as f:
-            opf_content = f.read()
-            
+        opf_content = self.opf_text()
+
         # Look for linear="no" attributes
         if 'linear="no"' in opf_content:
             print("  ✅ Non-linear spine items properly marked")
@@ -187,10 +267,8 @@ class PlatformGuidelinesChecker:
             print("  ✅ All required metadata present")
             
         # 3. Check for proper namespace declarations
-        sample_xhtml = self.oebps_dir / 'text' / '9-chapter-i-unveiling-your-creative-odyssey.xhtml'
-        with open(sample_xhtml, 'r', encoding='utf-8') as f:
-            content = f.read()
-            
+        content = self.sample_chapter_text()
+
         if 'xmlns="http://www.w3.org/1999/xhtml"' in content:
             print("  ✅ XHTML namespace properly declared")
         else:
@@ -208,36 +286,34 @@ class PlatformGuidelinesChecker:
         cover_found = False
         
         # Check in content.opf for cover reference
-        with open(self.oebps_dir / 'content.opf', 'r', encoding='utf-8') as f:
-            opf_content = f.read()
-            
+        opf_content = self.opf_text()
+
         if 'properties="cover-image"' in opf_content:
             cover_found = True
             print("  ✅ Cover image referenced in manifest")
         else:
             # Look for common cover file names
-            cover_files = list(self.oebps_dir.rglob('cover.*'))
+            cover_files = self.oebps_inventory()['covers']
             if cover_files:
                 cover_found = True
-                print(f"  ✅ Cover image file found: {cover_files[0].name}")
-            
+                print(f"  ✅ Cover image file found: {cover_files[0]}")
+
         if not cover_found:
             self.warnings.append("Common: No cover image detected")
             print("  ⚠️  No cover image found")
-            
+
         # 2. Check for table of contents
-        toc_files = list(self.oebps_dir.rglob('*toc*.xhtml')) + list(self.oebps_dir.rglob('*contents*.xhtml'))
+        toc_files = self.oebps_inventory()['tocs']
         if toc_files:
-            print(f"  ✅ Table of contents found: {toc_files[0].name}")
+            print(f"  ✅ Table of contents found: {toc_files[0]}")
         else:
             self.warnings.append("Common: No table of contents detected")
             print("  ⚠️  No table of contents found")
             
         # 3. Check reading order integrity
-        with open(self.oebps_dir / 'content.opf', 'r', encoding='utf-8') as f:
-            opf_content = f.read()
-            
-        spine_items = re.findall(r'<itemref idref="([^"]+)"', opf_content)
+        opf_content = self.opf_text()
+
+        spine_items = ITEMREF_RE.findall(opf_content)
         if len(spine_items) > 0:
             print(f"  ✅ Reading order defined: {len(spine_items)} items in spine")
         else: